@@ -7,8 +7,19 @@ databases. Supports multiple named database connections.
 """
 
 import os
+import re
 import json
+import time
+import queue
+import logging
+import logging.handlers
+import asyncio
+import datetime
+import operator
+import itertools
+import contextvars
 from contextlib import asynccontextmanager
+from collections import defaultdict
 from typing import Any, Dict, Optional
 from collections.abc import AsyncIterator
 
@@ -16,12 +27,458 @@ import asyncpg
 from dotenv import load_dotenv
 from mcp.server.fastmcp import FastMCP, Context
 
+# orjson parses and serializes JSON several times faster than the stdlib;
+# use it for config I/O when available, fall back to json otherwise.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Load environment variables
 load_dotenv()
 
+# Log through a queue drained by a background thread so the event loop
+# never blocks on a stderr write. print() (and a plain StreamHandler)
+# would hold the GIL for the write syscall on every connect/save message.
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(
+    _log_queue, logging.StreamHandler(), respect_handler_level=True
+)
+_log_listener.start()
+
+logger = logging.getLogger("postgres_mcp")
+logger.setLevel(logging.INFO)
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+
 # Create the MCP server
 mcp = FastMCP("PostgreSQL MCP Server")
 
+# How long cached schema/table metadata stays valid, in seconds.
+# Schemas change rarely, so repeated metadata calls within one LLM session
+# can be answered from memory instead of re-querying the catalogs.
+META_CACHE_TTL = float(os.getenv("META_CACHE_TTL", "60"))
+
+# Hot catalog queries, hoisted to module level. asyncpg's per-connection
+# statement cache is keyed on the query text, so passing the same string
+# object every call guarantees cache hits and skips the server-side
+# parse/plan step after the first execution.
+_Q_LIST_TABLES = """
+    SELECT
+        c.relname AS table_name,
+        CASE c.relkind
+            WHEN 'r' THEN 'BASE TABLE'
+            WHEN 'p' THEN 'BASE TABLE'
+            WHEN 'v' THEN 'VIEW'
+            WHEN 'm' THEN 'MATERIALIZED VIEW'
+            WHEN 'f' THEN 'FOREIGN'
+        END AS table_type,
+        CASE WHEN c.relkind IN ('r', 'p', 'f') THEN 'YES' ELSE 'NO' END AS is_insertable_into,
+        CASE WHEN c.reloftype <> 0 THEN 'YES' ELSE 'NO' END AS is_typed
+    FROM pg_catalog.pg_class c
+    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = $1
+      AND c.relkind IN ('r', 'v', 'm', 'f', 'p')
+    ORDER BY c.relname
+"""
+
+# Narrow variant for callers that only want the names: one column on the
+# wire instead of four, and no per-row key/value materialization.
+_Q_TABLE_NAMES = """
+    SELECT c.relname AS table_name
+    FROM pg_catalog.pg_class c
+    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = $1
+      AND c.relkind IN ('r', 'v', 'm', 'f', 'p')
+    ORDER BY c.relname
+"""
+
+# One fused query for the describe path: columns joined against their
+# constraints, aggregated per column. A single round-trip replaces the
+# separate column and constraint fetches, and each column row carries its
+# key flags directly so consumers don't have to join the two lists.
+_Q_COLUMNS_ENRICHED = """
+    SELECT
+        a.attname AS column_name,
+        pg_catalog.format_type(a.atttypid, a.atttypmod) AS data_type,
+        CASE WHEN a.attnotnull THEN 'NO' ELSE 'YES' END AS is_nullable,
+        pg_catalog.pg_get_expr(d.adbin, d.adrelid) AS column_default,
+        information_schema._pg_char_max_length(a.atttypid, a.atttypmod) AS character_maximum_length,
+        information_schema._pg_numeric_precision(a.atttypid, a.atttypmod) AS numeric_precision,
+        information_schema._pg_numeric_scale(a.atttypid, a.atttypmod) AS numeric_scale,
+        COALESCE(bool_or(con.contype = 'p'), false) AS is_primary_key,
+        COALESCE(bool_or(con.contype = 'u'), false) AS is_unique,
+        COALESCE(array_agg(DISTINCT con.conname) FILTER (WHERE con.contype = 'p'), '{}') AS primary_key_constraints,
+        COALESCE(array_agg(DISTINCT con.conname) FILTER (WHERE con.contype = 'u'), '{}') AS unique_constraints,
+        COALESCE(array_agg(DISTINCT con.conname) FILTER (WHERE con.contype = 'f'), '{}') AS foreign_key_constraints,
+        COALESCE(array_agg(DISTINCT con.conname) FILTER (WHERE con.contype = 'c'), '{}') AS check_constraints
+    FROM pg_catalog.pg_attribute a
+    JOIN pg_catalog.pg_class c ON c.oid = a.attrelid
+    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+    LEFT JOIN pg_catalog.pg_attrdef d
+        ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+    LEFT JOIN pg_catalog.pg_constraint con
+        ON con.conrelid = a.attrelid AND a.attnum = ANY(con.conkey)
+    WHERE n.nspname = $1
+      AND c.relname = $2
+      AND a.attnum > 0
+      AND NOT a.attisdropped
+    GROUP BY a.attrelid, a.attnum, a.attname, a.atttypid, a.atttypmod,
+             a.attnotnull, d.adbin, d.adrelid
+    ORDER BY a.attnum
+"""
+
+# The schema overview fetches table identity and columns separately: the
+# old single join repeated the table-level fields on every column row,
+# shipping them across the wire N-columns times. Listing (oid, name) once
+# and pulling columns for all tables via ANY($1::oid[]) sends each value
+# exactly once.
+_Q_SCHEMA_TABLES = """
+    SELECT
+        c.oid,
+        c.relname AS table_name
+    FROM pg_catalog.pg_class c
+    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = $1
+      AND c.relkind IN ('r', 'v', 'm', 'f', 'p')
+    ORDER BY c.relname
+"""
+
+_Q_SCHEMA_COLUMNS = """
+    SELECT
+        a.attrelid,
+        a.attname AS column_name,
+        pg_catalog.format_type(a.atttypid, a.atttypmod) AS data_type,
+        CASE WHEN a.attnotnull THEN 'NO' ELSE 'YES' END AS is_nullable,
+        pg_catalog.pg_get_expr(d.adbin, d.adrelid) AS column_default
+    FROM pg_catalog.pg_attribute a
+    LEFT JOIN pg_catalog.pg_attrdef d
+        ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+    WHERE a.attrelid = ANY($1::oid[])
+      AND a.attnum > 0
+      AND NOT a.attisdropped
+    ORDER BY a.attrelid, a.attnum
+"""
+
+# Schema-wide variant of _Q_COLUMNS_ENRICHED: same per-column constraint
+# aggregates, but for every table in an oid list at once, so describing a
+# whole schema costs two round-trips instead of one per table. attrelid
+# leads the select list so consumers can group on it and drop it.
+_Q_SCHEMA_COLUMNS_ENRICHED = """
+    SELECT
+        a.attrelid,
+        a.attname AS column_name,
+        pg_catalog.format_type(a.atttypid, a.atttypmod) AS data_type,
+        CASE WHEN a.attnotnull THEN 'NO' ELSE 'YES' END AS is_nullable,
+        pg_catalog.pg_get_expr(d.adbin, d.adrelid) AS column_default,
+        COALESCE(bool_or(con.contype = 'p'), false) AS is_primary_key,
+        COALESCE(bool_or(con.contype = 'u'), false) AS is_unique,
+        COALESCE(array_agg(DISTINCT con.conname) FILTER (WHERE con.contype = 'p'), '{}') AS primary_key_constraints,
+        COALESCE(array_agg(DISTINCT con.conname) FILTER (WHERE con.contype = 'u'), '{}') AS unique_constraints,
+        COALESCE(array_agg(DISTINCT con.conname) FILTER (WHERE con.contype = 'f'), '{}') AS foreign_key_constraints,
+        COALESCE(array_agg(DISTINCT con.conname) FILTER (WHERE con.contype = 'c'), '{}') AS check_constraints
+    FROM pg_catalog.pg_attribute a
+    LEFT JOIN pg_catalog.pg_attrdef d
+        ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+    LEFT JOIN pg_catalog.pg_constraint con
+        ON con.conrelid = a.attrelid AND a.attnum = ANY(con.conkey)
+    WHERE a.attrelid = ANY($1::oid[])
+      AND a.attnum > 0
+      AND NOT a.attisdropped
+    GROUP BY a.attrelid, a.attnum, a.attname, a.atttypid, a.atttypmod,
+             a.attnotnull, d.adbin, d.adrelid
+    ORDER BY a.attrelid, a.attnum
+"""
+
+# Maps the aggregated constraint-name arrays in _Q_COLUMNS_ENRICHED back
+# to the constraint_type labels the API has always returned.
+_CONSTRAINT_KINDS = (
+    ("primary_key_constraints", "PRIMARY KEY"),
+    ("unique_constraints", "UNIQUE"),
+    ("foreign_key_constraints", "FOREIGN KEY"),
+    ("check_constraints", "CHECK"),
+)
+
+
+def _constraints_from_columns(rows) -> list:
+    """
+    Rebuild [constraint_name, constraint_type, column_name] rows from the
+    per-column aggregates, preserving the shape of the old constraints
+    result set without a second round-trip.
+    """
+    out = []
+    for row in rows:
+        for key, label in _CONSTRAINT_KINDS:
+            for name in row[key] or ():
+                out.append([name, label, row["column_name"]])
+    return out
+
+
+# Markdown fragments shared by the schema resources, built once at import
+# instead of being re-created on every render.
+_MD_OVERVIEW_TITLE = "# Database Schema Overview\n\n"
+_MD_COLUMNS_HEADER = (
+    "| Column | Type | Nullable | Default |\n"
+    "|--------|------|----------|----------|\n"
+)
+_MD_CONSTRAINTS_HEADER = (
+    "| Name | Type | Column |\n"
+    "|------|------|--------|\n"
+)
+
+
+# Matches the first SQL keyword, skipping leading whitespace and
+# line/block comments. Only the matched prefix is ever touched, so huge
+# query bodies (e.g. megabyte INSERT ... VALUES blobs) are never copied
+# or upper-cased just to inspect their first word. The whitespace
+# alternative consumes one character per repetition: a \s+ branch inside
+# a repeated group backtracks exponentially when the prefix is not
+# followed by a letter, which would hang the event loop.
+_LEADING_KEYWORD = re.compile(r"(?:\s|--[^\n]*\n?|/\*.*?\*/)*([A-Za-z]+)", re.S)
+
+# Leading keywords that mark a result-returning query.
+_READ_KEYWORDS = frozenset({"SELECT", "WITH", "SHOW", "EXPLAIN", "TABLE", "VALUES"})
+
+
+def _is_read_query(query: str) -> bool:
+    """Return True if the query's first keyword starts a result-returning statement."""
+    match = _LEADING_KEYWORD.match(query)
+    return bool(match) and match.group(1).upper() in _READ_KEYWORDS
+
+
+# When MCP_SAFE_EXEC=1, SELECT queries are preflighted with
+# EXPLAIN (FORMAT JSON) and an explicit LIMIT is appended if the planner
+# estimates more rows than max_rows. This keeps memory and CPU bounded
+# even when an LLM asks for SELECT * on a huge table.
+_MCP_SAFE_EXEC = os.getenv("MCP_SAFE_EXEC", "0") == "1"
+
+_LIMIT_RE = re.compile(r"\bLIMIT\b", re.I)
+
+# Valid database identifiers: alphanumerics, underscores and hyphens.
+# One precompiled-regex pass instead of the two intermediate strings the
+# old replace/replace/isalnum chain allocated.
+_DB_ID_RE = re.compile(r"\A[A-Za-z0-9_-]+\Z")
+
+
+def _has_limit(query: str) -> bool:
+    """Crude check for an explicit LIMIT clause anywhere in the query."""
+    return bool(_LIMIT_RE.search(query))
+
+
+async def _apply_row_guard(conn, query: str, max_rows: int) -> str:
+    """
+    Preflight a read query with EXPLAIN and cap it at max_rows if the
+    planner expects a larger result. Returns the (possibly amended) query.
+    """
+    plan = await conn.fetchval("EXPLAIN (FORMAT JSON) " + query)
+    if isinstance(plan, str):
+        # The pass-through json codec delivers the plan as text
+        plan = json.loads(plan)
+    estimated_rows = plan[0]["Plan"].get("Plan Rows", 0)
+    if estimated_rows > max_rows:
+        query = f"{query.rstrip().rstrip(';')} LIMIT {max_rows}"
+    return query
+
+
+# Pool sizing and statement-cache knobs, overridable via environment.
+# The old min_size=1/max_size=10 capped concurrent tool calls at 10.
+#
+# Invariant: POSTGRES_STMT_CACHE_SIZE must stay non-zero. The module-level
+# _Q_* constants rely on asyncpg's implicit statement cache (fetch reuses
+# the server-prepared plan for identical query text); setting the size to
+# 0 would silently reintroduce a Parse round-trip on every metadata call.
+# The one sanctioned exception is a database configured with
+# "pgbouncer": true, where prepared statements would break transaction
+# pooling; _create_pool turns the cache (and prewarm) off for that pool.
+_POOL_MIN = int(os.getenv("POSTGRES_POOL_MIN", "4"))
+_POOL_MAX = int(os.getenv("POSTGRES_POOL_MAX", str(min(32, (os.cpu_count() or 4) * 2))))
+_STMT_CACHE_SIZE = int(os.getenv("POSTGRES_STMT_CACHE_SIZE", "1024"))
+
+
+async def _init_connection(conn):
+    """
+    Register pass-through codecs on a new connection.
+
+    json/jsonb values are delivered as raw text instead of being parsed
+    into Python objects that the MCP layer would immediately re-serialize,
+    and numeric comes back as str rather than Decimal (which the JSON
+    encoder would have to special-case anyway). This skips a decode/encode
+    round-trip per cell for these types.
+    """
+    for type_name in ("json", "jsonb", "numeric"):
+        await conn.set_type_codec(
+            type_name,
+            encoder=str,
+            decoder=str,
+            schema="pg_catalog",
+            format="text"
+        )
+
+
+async def _prewarm(conn):
+    """
+    Prime the implicit statement cache with the hot catalog queries.
+
+    Each query runs once through conn.fetch with arguments that match
+    nothing (an empty schema name / oid list), because fetch is what the
+    tools call and the implicit cache is what fetch consults - a bare
+    conn.prepare() would bypass that cache and warm nothing. Runs from
+    the pool's init callback, so the cost is paid once per physical
+    connection, never per acquire.
+    """
+    await conn.fetch(_Q_LIST_TABLES, "")
+    await conn.fetch(_Q_TABLE_NAMES, "")
+    await conn.fetch(_Q_COLUMNS_ENRICHED, "", "")
+    await conn.fetch(_Q_SCHEMA_TABLES, "")
+    await conn.fetch(_Q_SCHEMA_COLUMNS, [])
+    await conn.fetch(_Q_SCHEMA_COLUMNS_ENRICHED, [])
+
+
+async def _init_connection_prewarm(conn):
+    """Codec registration plus statement prewarm, for direct connections."""
+    await _init_connection(conn)
+    try:
+        await _prewarm(conn)
+    except Exception as e:
+        # Best effort: a failed warmup only means the first real call pays
+        # the parse step; it must not poison connection establishment.
+        logger.warning(f"Statement prewarm failed: {str(e)}")
+
+
+async def _create_pool(host: str, port: int, database: str, user: str, password: str,
+                       min_size: Optional[int] = None, max_size: Optional[int] = None,
+                       pgbouncer: bool = False) -> asyncpg.Pool:
+    """Create a connection pool with the shared tuning applied.
+
+    min_size/max_size override the environment defaults for a single
+    database, e.g. one that sits behind a small max_connections limit.
+    pgbouncer=True disables the statement cache and prewarm, which rely
+    on prepared statements that PgBouncer's transaction pooling breaks.
+    """
+    return await asyncpg.create_pool(
+        host=host,
+        port=port,
+        database=database,
+        user=user,
+        password=password,
+        min_size=min_size if min_size is not None else _POOL_MIN,
+        max_size=max_size if max_size is not None else _POOL_MAX,
+        max_inactive_connection_lifetime=300,
+        command_timeout=30,
+        statement_cache_size=0 if pgbouncer else _STMT_CACHE_SIZE,
+        # JIT compilation only pays off for large analytical plans; for the
+        # tiny catalog queries this server issues it is pure overhead.
+        server_settings={"jit": "off", "application_name": "postgres-mcp"},
+        init=_init_connection if pgbouncer else _init_connection_prewarm
+    )
+
+
+# Connection currently held by this task, as a (pool, connection) pair.
+_held_conn: contextvars.ContextVar = contextvars.ContextVar("postgres_mcp_conn", default=None)
+
+
+@asynccontextmanager
+async def _get_conn(pool: asyncpg.Pool) -> AsyncIterator[asyncpg.Connection]:
+    """
+    Acquire a connection from the pool, reusing one the current task
+    already holds.
+
+    Sequential queries within one tool call (EXPLAIN preflight + the real
+    query, overview table + column fetches, ...) then run on the same
+    pooled connection instead of bouncing between pool members, which
+    keeps hitting the same server-side prepared statements. The outermost
+    caller owns acquisition and release; nested uses are free.
+    """
+    held = _held_conn.get()
+    if held is not None and held[0] is pool:
+        yield held[1]
+        return
+
+    async with pool.acquire() as conn:
+        token = _held_conn.set((pool, conn))
+        try:
+            yield conn
+        finally:
+            _held_conn.reset(token)
+
+
+def _pool_error(db_context: "DatabaseContext", database_id: Optional[str]) -> Dict[str, Any]:
+    """Standard error payload for a missing/unavailable database connection."""
+    available_dbs = db_context.get_available_databases()
+    return {
+        "error": f"Database connection not available for '{database_id or 'default'}'. Available databases: {available_dbs}"
+    }
+
+
+def _error_info(e: Exception) -> Dict[str, Any]:
+    """
+    Build a structured error payload for a failed query.
+
+    asyncpg's PostgresError carries the interesting fields (sqlstate,
+    message, detail, hint, position) separately; returning them as keys is
+    both cheaper than stringifying the full error — which can embed the
+    whole query text — and machine-readable for the LLM on the other end.
+    """
+    if isinstance(e, asyncpg.PostgresError):
+        return {
+            "sqlstate": e.sqlstate,
+            "message": e.message,
+            "detail": getattr(e, "detail", None),
+            "hint": getattr(e, "hint", None),
+            "position": getattr(e, "position", None)
+        }
+    return {"type": type(e).__name__, "message": str(e)}
+
+
+def _jsonable(value: Any) -> Any:
+    """
+    Coerce a single cell value to a JSON-native type if needed.
+
+    Most values already arrive as str/int/float/bool/None — the
+    pass-through codecs keep json/jsonb/numeric that way — so the common
+    case is one type check. Anything else (datetimes, UUIDs, bytea,
+    arrays of those) is converted here once, keeping the MCP JSON encoder
+    on its fast path instead of the per-object fallback route.
+    """
+    if value is None or type(value) in (str, int, float, bool):
+        return value
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    if isinstance(value, bytes):
+        return value.hex()
+    return str(value)
+
+
+def _records(rows) -> list:
+    """Convert Records to dicts via zip over positional access.
+
+    dict(record) goes through the mapping protocol - a Python-level
+    keys()/__getitem__ call per column. Hoisting the key tuple once and
+    zipping keeps the per-row work inside C.
+    """
+    if not rows:
+        return []
+    keys = tuple(rows[0].keys())
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def _columnar(rows) -> Dict[str, Any]:
+    """
+    Convert a list of asyncpg Records to a columnar representation.
+
+    Instead of one dict per row (which repeats every column name N times
+    and allocates N dicts), return the column names once plus the rows as
+    plain value lists. This is both faster to build (iterating a Record is
+    a C-level value walk, no hashing) and much smaller when serialized.
+    """
+    if not rows:
+        return {"columns": [], "rows": []}
+    return {
+        "columns": list(rows[0].keys()),
+        "rows": [list(row) for row in rows]
+    }
+
 
 class DatabaseContext:
     """Database connection context supporting multiple databases."""
@@ -30,38 +487,132 @@ class DatabaseContext:
         self.pools: Dict[str, asyncpg.Pool] = {}
         self.default_database: Optional[str] = None
         self.config: Dict[str, Any] = {}
+        # In-flight lazy pool opens, shared by concurrent callers
+        self._pool_tasks: Dict[str, asyncio.Task] = {}
+        # Project indexes, maintained on add/remove so the project lookup
+        # tools don't have to scan every configured database
+        self._by_project_name: Dict[str, list[str]] = defaultdict(list)
+        self._by_project_tag: Dict[str, set[str]] = defaultdict(set)
+        # Cached list_databases payload, rebuilt after any mutation
+        self._db_snapshot: Optional[list] = None
+        # Metadata cache: key -> (monotonic timestamp, cached result)
+        self._meta_cache: Dict[tuple, tuple[float, Any]] = {}
+        # In-flight metadata fetches, shared by concurrent identical calls
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+
+    def _index_project(self, db_id: str, db_config: Dict[str, Any]):
+        """Add one database's project name/tags to the lookup indexes."""
+        project = db_config.get("project")
+        if not project:
+            return
+        name = project.get("name")
+        if name:
+            self._by_project_name[name].append(db_id)
+        for tag in project.get("tags") or []:
+            self._by_project_tag[tag].add(db_id)
+
+    def _unindex_project(self, db_id: str, db_config: Dict[str, Any]):
+        """Remove one database's project name/tags from the lookup indexes."""
+        project = db_config.get("project")
+        if not project:
+            return
+        name = project.get("name")
+        if name and db_id in self._by_project_name.get(name, []):
+            self._by_project_name[name].remove(db_id)
+        for tag in project.get("tags") or []:
+            self._by_project_tag[tag].discard(db_id)
+
+    def _rebuild_project_index(self):
+        """Rebuild the project indexes from the loaded configuration."""
+        self._by_project_name.clear()
+        self._by_project_tag.clear()
+        for db_id, db_config in self.config.get("databases", {}).items():
+            self._index_project(db_id, db_config)
+
+    def cache_get(self, key: tuple) -> Optional[Any]:
+        """Return a cached metadata result if it is still within the TTL."""
+        hit = self._meta_cache.get(key)
+        if hit and time.monotonic() - hit[0] < META_CACHE_TTL:
+            return hit[1]
+        return None
+
+    def cache_put(self, key: tuple, value: Any):
+        """Store a metadata result with the current timestamp."""
+        self._meta_cache[key] = (time.monotonic(), value)
+
+    def cache_clear(self):
+        """Drop all cached metadata (e.g. after connections change)."""
+        self._meta_cache.clear()
+
+    async def coalesce(self, key: tuple, producer) -> Any:
+        """Run producer(), sharing the result with concurrent identical calls.
+
+        Metadata queries are idempotent, so a burst of callers asking for
+        the same key (e.g. a client enumerating a schema) should cost one
+        database round-trip, not N. The first caller starts a task under
+        the key; everyone else awaits it. Same shared-task pattern as the
+        lazy pool opens in get_pool.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(producer())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await task
     
+    async def _open_pool(self, db_id: str, db_config: Dict[str, Any]) -> tuple[str, Optional[asyncpg.Pool]]:
+        """Open one connection pool, returning (db_id, pool) or (db_id, None) on failure."""
+        try:
+            pool = await _create_pool(
+                host=db_config["host"],
+                port=db_config["port"],
+                database=db_config["database"],
+                user=db_config["user"],
+                password=db_config["password"],
+                min_size=db_config.get("min_size"),
+                max_size=db_config.get("max_size"),
+                pgbouncer=bool(db_config.get("pgbouncer"))
+            )
+            logger.info(f"Connected to database '{db_id}': {db_config['host']}:{db_config['port']}/{db_config['database']}")
+            return db_id, pool
+        except Exception as e:
+            logger.warning(f"Failed to connect to database '{db_id}': {str(e)}")
+            return db_id, None
+
     async def connect(self):
-        """Initialize database connection pools for all configured databases."""
+        """Load configuration and (optionally) open database connection pools.
+
+        Pools are opened lazily on first get_pool call by default, so
+        startup pays no TCP/auth round-trips for databases that are never
+        queried in a session. Set POSTGRES_EAGER_CONNECT=1 to open every
+        configured pool up-front (concurrently) instead.
+        """
         # Load database configuration
         await self._load_config()
-        
-        # Create connection pools for each database
-        for db_id, db_config in self.config.get("databases", {}).items():
-            try:
-                pool = await asyncpg.create_pool(
-                    host=db_config["host"],
-                    port=db_config["port"],
-                    database=db_config["database"],
-                    user=db_config["user"],
-                    password=db_config["password"],
-                    min_size=1,
-                    max_size=10,
-                    command_timeout=30
-                )
-                self.pools[db_id] = pool
-                print(f"Connected to database '{db_id}': {db_config['host']}:{db_config['port']}/{db_config['database']}")
-            except Exception as e:
-                print(f"Failed to connect to database '{db_id}': {str(e)}")
-                
+        self._rebuild_project_index()
+
+        databases = self.config.get("databases", {})
+
+        if os.getenv("POSTGRES_EAGER_CONNECT", "0") == "1":
+            # Open all pools concurrently: startup latency is the slowest
+            # handshake instead of the sum over every configured database.
+            # Per-database failures are handled inside _open_pool, so a
+            # dead host doesn't block the others.
+            results = await asyncio.gather(
+                *(self._open_pool(db_id, db_config) for db_id, db_config in databases.items())
+            )
+            for db_id, pool in results:
+                if pool is not None:
+                    self.pools[db_id] = pool
+
         # Set default database
         self.default_database = self.config.get("default_database")
-        if self.default_database and self.default_database not in self.pools:
-            print(f"Warning: Default database '{self.default_database}' not available")
-            # Use first available database as default
-            if self.pools:
-                self.default_database = list(self.pools.keys())[0]
-                print(f"Using '{self.default_database}' as default database")
+        if self.default_database and self.default_database not in databases:
+            logger.warning(f"Default database '{self.default_database}' not configured")
+            # Use first configured database as default
+            if databases:
+                self.default_database = list(databases.keys())[0]
+                logger.info(f"Using '{self.default_database}' as default database")
     
     async def _load_config(self):
         """Load database configuration from file or environment variables."""
@@ -70,11 +621,12 @@ class DatabaseContext:
         # Try to load from config file first
         if os.path.exists(config_file):
             try:
-                with open(config_file, 'r') as f:
-                    self.config = json.load(f)
+                with open(config_file, 'rb') as f:
+                    raw = f.read()
+                self.config = orjson.loads(raw) if orjson is not None else json.loads(raw)
                 return
             except Exception as e:
-                print(f"Failed to load config file {config_file}: {str(e)}")
+                logger.error(f"Failed to load config file {config_file}: {str(e)}")
         
         # Fallback to environment variables (backward compatibility)
         host = os.getenv("POSTGRES_HOST", "localhost")
@@ -98,64 +650,111 @@ class DatabaseContext:
         }
     
     async def _save_config(self):
-        """Save current configuration to file."""
+        """Save current configuration to file (atomically)."""
         config_file = os.getenv("POSTGRES_CONFIG_FILE", "databases.json")
-        
+
         try:
-            # Create a copy of config without sensitive data for logging
-            safe_config = {
-                "databases": {},
-                "default_database": self.config.get("default_database")
-            }
-            
-            for db_id, db_config in self.config.get("databases", {}).items():
-                safe_config["databases"][db_id] = {
-                    "host": db_config["host"],
-                    "port": db_config["port"],
-                    "database": db_config["database"],
-                    "user": db_config["user"],
-                    "password": "***"  # Hide password in logs
-                }
-            
-            # Save full config to file
-            with open(config_file, 'w') as f:
-                json.dump(self.config, f, indent=2)
-            
-            print(f"Configuration saved to {config_file}")
-            
+            if orjson is not None:
+                payload = orjson.dumps(self.config, option=orjson.OPT_INDENT_2)
+            else:
+                payload = json.dumps(self.config, indent=2).encode()
+
+            # Write to a sibling temp file and rename it into place so a
+            # crash mid-write can never leave a truncated config behind.
+            tmp_file = config_file + ".tmp"
+            with open(tmp_file, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_file, config_file)
+
+            logger.info(f"Configuration saved to {config_file}")
+
         except Exception as e:
-            print(f"Failed to save config to {config_file}: {str(e)}")
+            logger.error(f"Failed to save config to {config_file}: {str(e)}")
             raise
     
-    def get_pool(self, database_id: Optional[str] = None) -> Optional[asyncpg.Pool]:
-        """Get connection pool for specified database or default."""
+    async def get_pool(self, database_id: Optional[str] = None) -> Optional[asyncpg.Pool]:
+        """Get connection pool for specified database or default, opening it on first use."""
         if database_id is None:
             database_id = self.default_database
-        
+
         if database_id is None:
             return None
-            
-        return self.pools.get(database_id)
-    
+
+        pool = self.pools.get(database_id)
+        if pool is not None:
+            return pool
+
+        db_config = self.config.get("databases", {}).get(database_id)
+        if db_config is None:
+            return None
+
+        # Share one open attempt between concurrent callers so a burst of
+        # tool calls doesn't race to create several pools.
+        task = self._pool_tasks.get(database_id)
+        if task is None:
+            task = asyncio.create_task(self._open_pool(database_id, db_config))
+            self._pool_tasks[database_id] = task
+
+        try:
+            _, pool = await task
+        except asyncio.CancelledError:
+            # remove_database cancelled the open while we waited on it
+            if task.cancelled():
+                return None
+            raise
+        self._pool_tasks.pop(database_id, None)
+        if pool is not None:
+            # The database may have been removed while the open was in
+            # flight; don't resurrect it with a pool nothing will close.
+            if database_id not in self.config.get("databases", {}):
+                await pool.close()
+                return None
+            self.pools[database_id] = pool
+        return pool
+
     def get_available_databases(self) -> list[str]:
-        """Get list of available database IDs."""
-        return list(self.pools.keys())
-        
+        """Get list of configured database IDs."""
+        return list(self.config.get("databases", {}).keys())
+
     async def disconnect(self):
         """Close all database connection pools."""
+        for task in self._pool_tasks.values():
+            task.cancel()
+        self._pool_tasks.clear()
         for db_id, pool in self.pools.items():
             await pool.close()
-            print(f"Disconnected from database '{db_id}'")
+            logger.info(f"Disconnected from database '{db_id}'")
+
+
+# The active DatabaseContext, bound once by app_lifespan. Tools resolve it
+# through _get_db_context with a single global load instead of walking the
+# ctx.request_context.lifespan_context attribute chain on every call.
+_db_context: Optional[DatabaseContext] = None
+
+# Pre-compiled attribute walk for the fallback path below.
+_lifespan_context = operator.attrgetter("request_context.lifespan_context")
+
+
+def _get_db_context(ctx: Optional[Context] = None) -> DatabaseContext:
+    """Return the active DatabaseContext (falling back to the MCP context)."""
+    if _db_context is not None:
+        return _db_context
+    if ctx is None:
+        ctx = mcp.get_context()
+    return _lifespan_context(ctx)
 
 
 @asynccontextmanager
 async def app_lifespan(server: FastMCP) -> AsyncIterator[DatabaseContext]:
     """Manage application lifecycle with database connections."""
+    global _db_context
     db_context = DatabaseContext()
     try:
         await db_context.connect()
+        _db_context = db_context
         yield db_context
     finally:
+        _db_context = None
         await db_context.disconnect()
 
 
@@ -164,48 +763,80 @@ mcp = FastMCP("PostgreSQL MCP Server", lifespan=app_lifespan)
 
 
 @mcp.tool()
-async def execute_query(query: str, ctx: Context, database_id: Optional[str] = None) -> Dict[str, Any]:
+async def execute_query(query: str, ctx: Context, database_id: Optional[str] = None,
+                        max_rows: int = 10000, format: str = "columnar") -> Dict[str, Any]:
     """
     Execute a SQL query against the PostgreSQL database.
-    
+
     Args:
         query: The SQL query to execute
         ctx: MCP context containing database connection
         database_id: Optional database identifier. If not provided, uses the default database.
-        
+        max_rows: Maximum number of rows to return for SELECT queries (default: 10000)
+        format: Result shape - "columnar" (column names once plus value rows)
+            or "records" (one dict per row, the original shape)
+
     Returns:
         Dictionary containing query results, row count, and metadata
     """
-    db_context: DatabaseContext = ctx.request_context.lifespan_context
+    db_context = _get_db_context(ctx)
     
-    pool = db_context.get_pool(database_id)
+    pool = await db_context.get_pool(database_id)
     if not pool:
-        available_dbs = db_context.get_available_databases()
-        return {
-            "error": f"Database connection not available for '{database_id or 'default'}'. Available databases: {available_dbs}"
-        }
+        return _pool_error(db_context, database_id)
     
     try:
-        async with pool.acquire() as conn:
+        async with _get_conn(pool) as conn:
             # Execute the query
-            if query.strip().upper().startswith(('SELECT', 'WITH')):
-                # For SELECT queries, fetch all results
-                rows = await conn.fetch(query)
-                
-                # Convert rows to dictionaries
-                results = [dict(row) for row in rows]
-                
-                return {
+            if _is_read_query(query):
+                if _MCP_SAFE_EXEC and not _has_limit(query):
+                    query = await _apply_row_guard(conn, query, max_rows)
+
+                # For SELECT queries, stream rows through a server-side
+                # cursor instead of conn.fetch. fetch would buffer the full
+                # result set as Record objects before we convert to dicts,
+                # doubling peak memory; the cursor keeps at most one
+                # prefetch batch in flight and lets us stop at max_rows.
+                # Rows are emitted in columnar form by default: column
+                # names once, then plain value lists (see _columnar for
+                # the rationale). format="records" restores the original
+                # one-dict-per-row shape for consumers that expect it.
+                records = format == "records"
+                columns = []
+                data = []
+                truncated = False
+                async with conn.transaction():
+                    async for row in conn.cursor(query, prefetch=1000):
+                        if not columns:
+                            columns = list(row.keys())
+                        values = [_jsonable(value) for value in row]
+                        data.append(dict(zip(columns, values)) if records else values)
+                        if len(data) >= max_rows:
+                            truncated = True
+                            break
+
+                result = {
                     "success": True,
-                    "results": results,
-                    "row_count": len(results),
+                    "row_count": len(data),
+                    "truncated": truncated,
                     "query": query,
                     "database_id": database_id or db_context.default_database
                 }
+                if records:
+                    result["results"] = data
+                else:
+                    result["columns"] = columns
+                    result["rows"] = data
+                return result
             else:
                 # For INSERT, UPDATE, DELETE, etc.
                 result = await conn.execute(query)
-                
+
+                # The statement may have been DDL; drop cached metadata so
+                # a follow-up list_tables/describe_table in the same
+                # session sees the new state instead of a stale TTL hit.
+                db_context.cache_clear()
+
                 return {
                     "success": True,
                     "message": result,
@@ -216,62 +847,215 @@ async def execute_query(query: str, ctx: Context, database_id: Optional[str] = N
     except Exception as e:
         return {
             "success": False,
-            "error": str(e),
+            "error": _error_info(e),
+            "query": query,
+            "database_id": database_id or db_context.default_database
+        }
+
+
+@mcp.tool()
+async def stream_query(query: str, ctx: Context, database_id: Optional[str] = None,
+                       chunk_size: int = 1000, max_rows: int = 100000) -> Dict[str, Any]:
+    """
+    Execute a large SELECT query, streaming rows in batches with progress updates.
+
+    Unlike execute_query this fetches the result in chunk_size batches
+    from a server-side cursor and reports progress to the client after
+    each batch, so long-running reads stay responsive and memory use
+    grows only with the rows actually returned.
+
+    Args:
+        query: The SQL query to execute (must be a result-returning query)
+        ctx: MCP context containing database connection
+        database_id: Optional database identifier. If not provided, uses the default database.
+        chunk_size: Number of rows fetched per cursor batch (default: 1000)
+        max_rows: Maximum total rows to return (default: 100000)
+
+    Returns:
+        Dictionary containing columnar query results, row count, and metadata
+    """
+    db_context = _get_db_context(ctx)
+
+    pool = await db_context.get_pool(database_id)
+    if not pool:
+        return _pool_error(db_context, database_id)
+
+    if not _is_read_query(query):
+        return {
+            "success": False,
+            "error": {"type": "ValueError", "message": "stream_query only accepts result-returning queries"},
+            "query": query,
+            "database_id": database_id or db_context.default_database
+        }
+
+    try:
+        columns = []
+        data = []
+        truncated = False
+        async with _get_conn(pool) as conn:
+            async with conn.transaction():
+                cursor = await conn.cursor(query)
+                while True:
+                    batch = await cursor.fetch(chunk_size)
+                    if not batch:
+                        break
+                    if not columns:
+                        columns = list(batch[0].keys())
+                    for row in batch:
+                        data.append([_jsonable(value) for value in row])
+                    await ctx.report_progress(len(data))
+                    if len(data) >= max_rows:
+                        truncated = True
+                        break
+
+        return {
+            "success": True,
+            "columns": columns,
+            "rows": data,
+            "row_count": len(data),
+            "truncated": truncated,
+            "query": query,
+            "database_id": database_id or db_context.default_database
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": _error_info(e),
             "query": query,
             "database_id": database_id or db_context.default_database
         }
 
 
 @mcp.tool()
-async def list_tables(ctx: Context, schema: str = "public", database_id: Optional[str] = None) -> Dict[str, Any]:
+async def execute_queries(queries: list, ctx: Context, database_id: Optional[str] = None,
+                          max_rows: int = 10000) -> Dict[str, Any]:
+    """
+    Execute several independent queries concurrently on one database.
+
+    Each query runs on its own pool connection, so N queries complete in
+    roughly the latency of the slowest one instead of the sum. Results
+    come back in the same order as the input; a failing query yields an
+    error entry without affecting the others.
+
+    Args:
+        queries: List of SQL queries to execute
+        ctx: MCP context containing database connection
+        database_id: Optional database identifier. If not provided, uses the default database.
+        max_rows: Maximum number of rows to return per query (default: 10000)
+
+    Returns:
+        Dictionary with a per-query result list and metadata
+    """
+    db_context = _get_db_context(ctx)
+
+    pool = await db_context.get_pool(database_id)
+    if not pool:
+        return _pool_error(db_context, database_id)
+
+    # Cap fan-out at the pool's own size so a long query list queues on
+    # the semaphore instead of piling up in pool.acquire.
+    gate = asyncio.Semaphore(pool.get_max_size())
+
+    async def _run_one(query: str) -> Dict[str, Any]:
+        try:
+            async with gate:
+                async with pool.acquire() as conn:
+                    if _is_read_query(query):
+                        columns = []
+                        data = []
+                        truncated = False
+                        async with conn.transaction():
+                            async for row in conn.cursor(query, prefetch=1000):
+                                if not columns:
+                                    columns = list(row.keys())
+                                data.append([_jsonable(value) for value in row])
+                                if len(data) >= max_rows:
+                                    truncated = True
+                                    break
+                        return {
+                            "success": True,
+                            "columns": columns,
+                            "rows": data,
+                            "row_count": len(data),
+                            "truncated": truncated,
+                            "query": query
+                        }
+                    status = await conn.execute(query)
+                    # Same stale-metadata guard as execute_query's write path
+                    db_context.cache_clear()
+                    return {"success": True, "message": status, "query": query}
+        except Exception as e:
+            return {"success": False, "error": _error_info(e), "query": query}
+
+    results = await asyncio.gather(*(_run_one(query) for query in queries))
+    return {
+        "success": all(r["success"] for r in results),
+        "results": results,
+        "query_count": len(results),
+        "database_id": database_id or db_context.default_database
+    }
+
+
+@mcp.tool()
+async def list_tables(ctx: Context, schema: str = "public", database_id: Optional[str] = None,
+                      format: str = "columnar", names_only: bool = False) -> Dict[str, Any]:
     """
     List all tables in the specified schema.
-    
+
     Args:
         ctx: MCP context containing database connection
         schema: Database schema name (default: public)
         database_id: Optional database identifier. If not provided, uses the default database.
-        
+        format: Result shape - "columnar" or "records" (one dict per table)
+        names_only: Return just a flat list of table names (less data on the wire)
+
     Returns:
         Dictionary containing list of tables and their basic info
     """
-    db_context: DatabaseContext = ctx.request_context.lifespan_context
+    db_context = _get_db_context(ctx)
     
-    pool = db_context.get_pool(database_id)
+    pool = await db_context.get_pool(database_id)
     if not pool:
-        available_dbs = db_context.get_available_databases()
-        return {
-            "error": f"Database connection not available for '{database_id or 'default'}'. Available databases: {available_dbs}"
-        }
-    
-    try:
-        async with pool.acquire() as conn:
-            query = """
-                SELECT 
-                    table_name,
-                    table_type,
-                    is_insertable_into,
-                    is_typed
-                FROM information_schema.tables 
-                WHERE table_schema = $1
-                ORDER BY table_name
-            """
-            
-            rows = await conn.fetch(query, schema)
-            tables = [dict(row) for row in rows]
-            
-            return {
+        return _pool_error(db_context, database_id)
+
+    cache_key = ("list_tables", database_id or db_context.default_database, schema, format, names_only)
+    cached = db_context.cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    async def _fetch() -> Dict[str, Any]:
+        async with _get_conn(pool) as conn:
+            # Query pg_catalog directly instead of information_schema.tables.
+            # The information_schema views add joins and privilege filtering
+            # on every call; hitting pg_class/pg_namespace is several times
+            # cheaper while returning the same keys.
+            if names_only:
+                rows = await conn.fetch(_Q_TABLE_NAMES, schema)
+                # Indexed Record access skips the per-row dict/key handling
+                tables = [row[0] for row in rows]
+            else:
+                rows = await conn.fetch(_Q_LIST_TABLES, schema)
+                tables = _records(rows) if format == "records" else _columnar(rows)
+
+            result = {
                 "success": True,
                 "schema": schema,
                 "tables": tables,
-                "count": len(tables),
+                "count": len(rows),
                 "database_id": database_id or db_context.default_database
             }
-            
+            db_context.cache_put(cache_key, result)
+            return result
+
+    try:
+        # Concurrent identical calls share one round-trip
+        return await db_context.coalesce(cache_key, _fetch)
+
     except Exception as e:
         return {
             "success": False,
-            "error": str(e),
+            "error": _error_info(e),
             "schema": schema,
             "database_id": database_id or db_context.default_database
         }
@@ -279,83 +1063,159 @@ async def list_tables(ctx: Context, schema: str = "public", database_id: Optiona
 
 @mcp.tool()
 async def describe_table(table_name: str, ctx: Context,
-                         schema: str = "public", database_id: Optional[str] = None) -> Dict[str, Any]:
+                         schema: str = "public", database_id: Optional[str] = None,
+                         format: str = "columnar") -> Dict[str, Any]:
     """
-    Get detailed information about a specific table including columns, 
+    Get detailed information about a specific table including columns,
     types, and constraints.
-    
+
     Args:
         table_name: Name of the table to describe
         ctx: MCP context containing database connection
         schema: Database schema name (default: public)
         database_id: Optional database identifier. If not provided, uses the default database.
-        
+        format: Result shape - "columnar" or "records" (one dict per column/constraint)
+
     Returns:
         Dictionary containing table structure information
     """
-    db_context: DatabaseContext = ctx.request_context.lifespan_context
+    db_context = _get_db_context(ctx)
     
-    pool = db_context.get_pool(database_id)
+    pool = await db_context.get_pool(database_id)
     if not pool:
-        available_dbs = db_context.get_available_databases()
-        return {
-            "error": f"Database connection not available for '{database_id or 'default'}'. Available databases: {available_dbs}"
-        }
-    
-    try:
-        async with pool.acquire() as conn:
-            # Get column information
-            columns_query = """
-                SELECT 
-                    column_name,
-                    data_type,
-                    is_nullable,
-                    column_default,
-                    character_maximum_length,
-                    numeric_precision,
-                    numeric_scale
-                FROM information_schema.columns 
-                WHERE table_schema = $1 AND table_name = $2
-                ORDER BY ordinal_position
-            """
-            
-            columns = await conn.fetch(columns_query, schema, table_name)
-            
-            # Get constraints information
-            constraints_query = """
-                SELECT 
-                    tc.constraint_name,
-                    tc.constraint_type,
-                    kcu.column_name
-                FROM information_schema.table_constraints tc
-                JOIN information_schema.key_column_usage kcu 
-                    ON tc.constraint_name = kcu.constraint_name
-                    AND tc.table_schema = kcu.table_schema
-                    AND tc.table_name = kcu.table_name
-                WHERE tc.table_schema = $1 AND tc.table_name = $2
-            """
-            
-            constraints = await conn.fetch(constraints_query, schema, table_name)
-            
-            return {
+        return _pool_error(db_context, database_id)
+
+    cache_key = ("describe_table", database_id or db_context.default_database, schema, table_name, format)
+    cached = db_context.cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    async def _fetch() -> Dict[str, Any]:
+        # One fused query fetches columns with their constraint flags
+        # aggregated in: a single round-trip where there used to be two,
+        # and each column row already says whether it is a key. The
+        # constraints result set is rebuilt client-side from the same rows
+        # so the response keeps its old shape.
+        async with _get_conn(pool) as conn:
+            columns = await conn.fetch(_Q_COLUMNS_ENRICHED, schema, table_name)
+            constraint_rows = _constraints_from_columns(columns)
+
+            if format == "records":
+                column_payload = _records(columns)
+                constraint_payload = [
+                    {"constraint_name": name, "constraint_type": ctype, "column_name": col}
+                    for name, ctype, col in constraint_rows
+                ]
+            else:
+                column_payload = _columnar(columns)
+                constraint_payload = {
+                    "columns": ["constraint_name", "constraint_type", "column_name"],
+                    "rows": constraint_rows
+                }
+
+            result = {
                 "success": True,
                 "table_name": table_name,
                 "schema": schema,
-                "columns": [dict(col) for col in columns],
-                "constraints": [dict(const) for const in constraints],
+                "columns": column_payload,
+                "constraints": constraint_payload,
                 "database_id": database_id or db_context.default_database
             }
-            
+            db_context.cache_put(cache_key, result)
+            return result
+
+    try:
+        # Concurrent identical calls share one round-trip
+        return await db_context.coalesce(cache_key, _fetch)
+
     except Exception as e:
         return {
             "success": False,
-            "error": str(e),
+            "error": _error_info(e),
             "table_name": table_name,
             "schema": schema,
             "database_id": database_id or db_context.default_database
         }
 
 
+@mcp.tool()
+async def describe_schema(ctx: Context, schema: str = "public",
+                          database_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Describe every table in a schema in one call.
+
+    Replaces the list_tables-then-describe_table-per-table pattern
+    (1 + N round-trips) with two: one for the table list, one fetching
+    the enriched columns for all of them via ANY(oid[]).
+
+    Args:
+        ctx: MCP context containing database connection
+        schema: Database schema name (default: public)
+        database_id: Optional database identifier. If not provided, uses the default database.
+
+    Returns:
+        Dictionary mapping table names to their columns and constraints
+    """
+    db_context = _get_db_context(ctx)
+
+    pool = await db_context.get_pool(database_id)
+    if not pool:
+        return _pool_error(db_context, database_id)
+
+    cache_key = ("describe_schema", database_id or db_context.default_database, schema)
+    cached = db_context.cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    async def _fetch() -> Dict[str, Any]:
+        async with _get_conn(pool) as conn:
+            table_rows = await conn.fetch(_Q_SCHEMA_TABLES, schema)
+            oids = [row["oid"] for row in table_rows]
+            column_rows = await conn.fetch(_Q_SCHEMA_COLUMNS_ENRICHED, oids) if oids else []
+
+        columns_by_oid = {
+            oid: list(group)
+            for oid, group in itertools.groupby(column_rows, key=lambda row: row["attrelid"])
+        }
+        # attrelid leads the select list; slice it off the payload rows
+        column_names = list(column_rows[0].keys())[1:] if column_rows else []
+
+        tables = {}
+        for table_row in table_rows:
+            cols = columns_by_oid.get(table_row["oid"], [])
+            tables[table_row["table_name"]] = {
+                "columns": {
+                    "columns": column_names,
+                    "rows": [list(col)[1:] for col in cols]
+                },
+                "constraints": {
+                    "columns": ["constraint_name", "constraint_type", "column_name"],
+                    "rows": _constraints_from_columns(cols)
+                }
+            }
+
+        result = {
+            "success": True,
+            "schema": schema,
+            "tables": tables,
+            "table_count": len(tables),
+            "database_id": database_id or db_context.default_database
+        }
+        db_context.cache_put(cache_key, result)
+        return result
+
+    try:
+        return await db_context.coalesce(cache_key, _fetch)
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": _error_info(e),
+            "schema": schema,
+            "database_id": database_id or db_context.default_database
+        }
+
+
 @mcp.tool()
 async def list_databases(ctx: Context) -> Dict[str, Any]:
     """
@@ -367,28 +1227,29 @@ async def list_databases(ctx: Context) -> Dict[str, Any]:
     Returns:
         Dictionary containing list of available databases and connection info
     """
-    db_context: DatabaseContext = ctx.request_context.lifespan_context
-    
-    available_dbs = db_context.get_available_databases()
-    
-    database_info = []
-    for db_id in available_dbs:
-        if db_id in db_context.config.get("databases", {}):
-            config = db_context.config["databases"][db_id]
-            database_info.append({
+    db_context = _get_db_context(ctx)
+
+    # The database list only changes on add/remove/default mutations,
+    # which all drop the snapshot; between mutations (the common case,
+    # e.g. a UI polling this tool) the answer is a cached list.
+    if db_context._db_snapshot is None:
+        db_context._db_snapshot = [
+            {
                 "id": db_id,
                 "host": config["host"],
                 "port": config["port"],
                 "database": config["database"],
                 "user": config["user"],
                 "is_default": db_id == db_context.default_database
-            })
-    
+            }
+            for db_id, config in db_context.config.get("databases", {}).items()
+        ]
+
     return {
         "success": True,
-        "databases": database_info,
+        "databases": db_context._db_snapshot,
         "default_database": db_context.default_database,
-        "count": len(available_dbs)
+        "count": len(db_context._db_snapshot)
     }
 
 
@@ -404,11 +1265,14 @@ async def add_database(
     set_as_default: bool = False,
     project_name: Optional[str] = None,
     project_description: Optional[str] = None,
-    project_tags: Optional[str] = None
+    project_tags: Optional[str] = None,
+    min_size: Optional[int] = None,
+    max_size: Optional[int] = None,
+    pgbouncer: bool = False
 ) -> Dict[str, Any]:
     """
     Add a new database connection dynamically.
-    
+
     Args:
         ctx: MCP context containing database connection
         database_id: Unique identifier for this database connection
@@ -421,21 +1285,25 @@ async def add_database(
         project_name: Optional project name this database belongs to
         project_description: Optional project description
         project_tags: Optional comma-separated tags for project categorization
+        min_size: Optional pool minimum size (default: POSTGRES_POOL_MIN)
+        max_size: Optional pool maximum size (default: POSTGRES_POOL_MAX)
+        pgbouncer: Set if the connection goes through PgBouncer in
+            transaction-pooling mode (disables prepared-statement caching)
         
     Returns:
         Dictionary containing operation result
     """
-    db_context: DatabaseContext = ctx.request_context.lifespan_context
+    db_context = _get_db_context(ctx)
     
-    # Check if database_id already exists
-    if database_id in db_context.pools:
+    # Check if database_id already exists (configured or already opened)
+    if database_id in db_context.pools or database_id in db_context.config.get("databases", {}):
         return {
             "success": False,
             "error": f"Database '{database_id}' already exists"
         }
     
     # Validate database_id format
-    if not database_id.replace("_", "").replace("-", "").isalnum():
+    if not _DB_ID_RE.match(database_id):
         return {
             "success": False,
             "error": "Database ID must contain only alphanumeric characters, underscores, and hyphens"
@@ -443,15 +1311,15 @@ async def add_database(
     
     try:
         # Create connection pool for the new database
-        pool = await asyncpg.create_pool(
+        pool = await _create_pool(
             host=host,
             port=port,
             database=database,
             user=user,
             password=password,
-            min_size=1,
-            max_size=10,
-            command_timeout=30
+            min_size=min_size,
+            max_size=max_size,
+            pgbouncer=pgbouncer
         )
         
         # Add to pools
@@ -467,22 +1335,27 @@ async def add_database(
             "database": database,
             "user": user,
             "password": password,
+            **({"min_size": min_size} if min_size is not None else {}),
+            **({"max_size": max_size} if max_size is not None else {}),
+            **({"pgbouncer": True} if pgbouncer else {}),
             "project": {
                 "name": project_name,
                 "description": project_description,
                 "tags": project_tags.split(",") if project_tags else []
             } if project_name else None
         }
-        
+        db_context._index_project(database_id, db_context.config["databases"][database_id])
+
         # Set as default if requested or if no default exists
         if set_as_default or db_context.default_database is None:
             db_context.default_database = database_id
             db_context.config["default_database"] = database_id
+        db_context._db_snapshot = None
         
         # Save updated config to file
         await db_context._save_config()
         
-        print(f"Added database '{database_id}': {host}:{port}/{database}")
+        logger.info(f"Added database '{database_id}': {host}:{port}/{database}")
         
         return {
             "success": True,
@@ -515,46 +1388,35 @@ async def find_databases_by_project(
     Returns:
         Dictionary containing matching databases with project info
     """
-    db_context: DatabaseContext = ctx.request_context.lifespan_context
-    
+    db_context = _get_db_context(ctx)
+    databases = db_context.config.get("databases", {})
+
+    # Resolve matches through the maintained project indexes instead of
+    # scanning every database's config on each call. With no criteria the
+    # old behavior stands: every configured database matches.
+    if project_name or project_tag:
+        matched_ids = set()
+        if project_name:
+            matched_ids.update(db_context._by_project_name.get(project_name, ()))
+        if project_tag:
+            matched_ids.update(db_context._by_project_tag.get(project_tag, ()))
+    else:
+        matched_ids = set(databases.keys())
+
     matching_databases = []
-    
-    for db_id in db_context.get_available_databases():
-        if db_id in db_context.config.get("databases", {}):
-            config = db_context.config["databases"][db_id]
-            project_info = config.get("project")
-            
-            # Check if this database matches the search criteria
-            matches = False
-            
-            if project_info:
-                # Match by project name
-                if project_name and project_info.get("name") == project_name:
-                    matches = True
-                
-                # Match by project tag
-                if project_tag and project_tag in project_info.get("tags", []):
-                    matches = True
-                
-                # If no search criteria provided, include all databases with project info
-                if not project_name and not project_tag:
-                    matches = True
-            elif not project_name and not project_tag:
-                # Include databases without project info if no criteria specified
-                matches = True
-            
-            if matches:
-                db_info = {
-                    "id": db_id,
-                    "host": config["host"],
-                    "port": config["port"],
-                    "database": config["database"],
-                    "user": config["user"],
-                    "is_default": db_id == db_context.default_database,
-                    "project": project_info
-                }
-                matching_databases.append(db_info)
-    
+    for db_id, config in databases.items():
+        if db_id not in matched_ids:
+            continue
+        matching_databases.append({
+            "id": db_id,
+            "host": config["host"],
+            "port": config["port"],
+            "database": config["database"],
+            "user": config["user"],
+            "is_default": db_id == db_context.default_database,
+            "project": config.get("project")
+        })
+
     return {
         "success": True,
         "databases": matching_databases,
@@ -581,41 +1443,36 @@ async def get_project_database(
     Returns:
         Dictionary containing the project's database info or error
     """
-    db_context: DatabaseContext = ctx.request_context.lifespan_context
-    
-    # Find databases for this project
-    project_databases = []
-    
-    for db_id in db_context.get_available_databases():
-        if db_id in db_context.config.get("databases", {}):
-            config = db_context.config["databases"][db_id]
-            project_info = config.get("project")
-            
-            if project_info and project_info.get("name") == project_name:
-                project_databases.append({
-                    "id": db_id,
-                    "host": config["host"],
-                    "port": config["port"],
-                    "database": config["database"],
-                    "user": config["user"],
-                    "is_default": db_id == db_context.default_database,
-                    "project": project_info
-                })
-    
-    if not project_databases:
+    db_context = _get_db_context(ctx)
+
+    # The index preserves insertion order, so the first entry is the
+    # project's primary database as before.
+    db_ids = db_context._by_project_name.get(project_name, [])
+    databases = db_context.config.get("databases", {})
+    db_ids = [db_id for db_id in db_ids if db_id in databases]
+
+    if not db_ids:
         return {
             "success": False,
             "error": f"No database found for project '{project_name}'"
         }
-    
-    # Return the first database (primary) for the project
-    primary_db = project_databases[0]
-    
+
+    primary_id = db_ids[0]
+    config = databases[primary_id]
+
     return {
         "success": True,
-        "database": primary_db,
+        "database": {
+            "id": primary_id,
+            "host": config["host"],
+            "port": config["port"],
+            "database": config["database"],
+            "user": config["user"],
+            "is_default": primary_id == db_context.default_database,
+            "project": config.get("project")
+        },
         "project_name": project_name,
-        "total_databases": len(project_databases)
+        "total_databases": len(db_ids)
     }
 
 
@@ -631,37 +1488,49 @@ async def remove_database(ctx: Context, database_id: str) -> Dict[str, Any]:
     Returns:
         Dictionary containing operation result
     """
-    db_context: DatabaseContext = ctx.request_context.lifespan_context
+    db_context = _get_db_context(ctx)
     
-    # Check if database exists
-    if database_id not in db_context.pools:
+    databases = db_context.config.get("databases", {})
+
+    # Check if database exists (pools open lazily, so check the config too)
+    if database_id not in db_context.pools and database_id not in databases:
         return {
             "success": False,
             "error": f"Database '{database_id}' not found"
         }
-    
+
     # Don't allow removing the last database
-    if len(db_context.pools) == 1:
+    if len(databases) == 1:
         return {
             "success": False,
             "error": "Cannot remove the last database connection"
         }
-    
+
     try:
-        # Close the connection pool
-        pool = db_context.pools[database_id]
-        await pool.close()
-        
-        # Remove from pools and config
-        del db_context.pools[database_id]
-        if database_id in db_context.config.get("databases", {}):
-            del db_context.config["databases"][database_id]
-        
+        # Cancel any lazy open still in flight so it can't resurrect the
+        # database after removal (get_pool also re-checks the config)
+        task = db_context._pool_tasks.pop(database_id, None)
+        if task is not None:
+            task.cancel()
+
+        # Close the connection pool if it was ever opened
+        pool = db_context.pools.pop(database_id, None)
+        if pool is not None:
+            await pool.close()
+
+        # Drop any metadata cached for it, and remove from config and the
+        # project indexes
+        db_context.cache_clear()
+        db_context._db_snapshot = None
+        if database_id in databases:
+            db_context._unindex_project(database_id, databases[database_id])
+            del databases[database_id]
+
         # Update default if necessary
         if db_context.default_database == database_id:
-            # Set first available database as default
-            if db_context.pools:
-                db_context.default_database = list(db_context.pools.keys())[0]
+            # Set first configured database as default
+            if databases:
+                db_context.default_database = list(databases.keys())[0]
                 db_context.config["default_database"] = db_context.default_database
             else:
                 db_context.default_database = None
@@ -670,7 +1539,7 @@ async def remove_database(ctx: Context, database_id: str) -> Dict[str, Any]:
         # Save updated config to file
         await db_context._save_config()
         
-        print(f"Removed database '{database_id}'")
+        logger.info(f"Removed database '{database_id}'")
         
         return {
             "success": True,
@@ -693,7 +1562,48 @@ async def get_all_tables_schema() -> str:
     Provide a comprehensive schema overview from the default database.
     Note: Resources cannot accept database_id parameter due to MCP limitations.
     """
-    return "Resource access not available in multi-database mode. Use list_tables tool instead."
+    db_context = _get_db_context()
+
+    pool = await db_context.get_pool()
+    if not pool:
+        return "Resource not available: no default database connection. Use list_tables tool instead."
+
+    try:
+        async with _get_conn(pool) as conn:
+            table_rows = await conn.fetch(_Q_SCHEMA_TABLES, "public")
+            if table_rows:
+                oids = [row["oid"] for row in table_rows]
+                column_rows = await conn.fetch(_Q_SCHEMA_COLUMNS, oids)
+            else:
+                column_rows = []
+
+        # Group columns by table oid; they arrive ordered by (attrelid,
+        # attnum), so one groupby pass is enough.
+        columns_by_oid = {
+            oid: list(group)
+            for oid, group in itertools.groupby(column_rows, key=lambda r: r["attrelid"])
+        }
+
+        # Build the Markdown with list.append + "".join rather than
+        # repeated string concatenation, which is O(N^2) for schemas with
+        # many columns.
+        parts = [_MD_OVERVIEW_TITLE]
+        for table_row in table_rows:
+            parts.append(f"## Table: {table_row['table_name']}\n\n")
+            parts.append(_MD_COLUMNS_HEADER)
+            for row in columns_by_oid.get(table_row["oid"], ()):
+                parts.append(
+                    f"| {row['column_name']} | {row['data_type']} | "
+                    f"{row['is_nullable']} | {row['column_default'] or ''} |\n"
+                )
+            parts.append("\n")
+
+        return "".join(parts)
+
+    except Exception as e:
+        # Resources return text, so surface just the message rather than
+        # stringifying the full error (which can embed the query text).
+        return f"Failed to load schema overview: {_error_info(e)['message']}"
 
 
 @mcp.resource("schema://table/{table_name}")
@@ -702,23 +1612,47 @@ async def get_table_schema(table_name: str) -> str:
     Provide detailed schema information for a specific table.
     Note: Resources cannot accept database_id parameter due to MCP limitations.
     """
-    return f"Resource access not available in multi-database mode. Use describe_table tool for '{table_name}' instead."
+    db_context = _get_db_context()
 
+    pool = await db_context.get_pool()
+    if not pool:
+        return f"Resource not available: no default database connection. Use describe_table tool for '{table_name}' instead."
 
-@mcp.prompt()
-def sql_query_helper(table_name: str, operation: str = "SELECT", database_id: Optional[str] = None) -> str:
-    """
-    Generate a helpful prompt for writing SQL queries against a specific table.
-    
-    Args:
-        table_name: The table to query
-        operation: Type of SQL operation (SELECT, INSERT, UPDATE, DELETE)
-        database_id: Optional database identifier
-    """
-    db_info = f" in database '{database_id}'" if database_id else ""
-    
+    try:
+        # Same fused single-query describe path as describe_table.
+        async with _get_conn(pool) as conn:
+            columns = await conn.fetch(_Q_COLUMNS_ENRICHED, "public", table_name)
+        constraints = _constraints_from_columns(columns)
+
+        if not columns:
+            return f"Table '{table_name}' not found in the default database."
+
+        # Same append + join pattern as the schema overview to keep the
+        # Markdown build linear in the number of rows.
+        parts = [f"# Table: {table_name}\n\n"]
+        parts.append(_MD_COLUMNS_HEADER)
+        for row in columns:
+            parts.append(
+                f"| {row['column_name']} | {row['data_type']} | "
+                f"{row['is_nullable']} | {row['column_default'] or ''} |\n"
+            )
+
+        if constraints:
+            parts.append("\n## Constraints\n\n")
+            parts.append(_MD_CONSTRAINTS_HEADER)
+            for name, constraint_type, column_name in constraints:
+                parts.append(f"| {name} | {constraint_type} | {column_name} |\n")
+
+        return "".join(parts)
+
+    except Exception as e:
+        return f"Failed to load schema for '{table_name}': {_error_info(e)['message']}"
+
+
+def _render_prompt_template(operation: str) -> str:
+    """Build the sql_query_helper template for one operation."""
     return f"""
-Help me write a {operation} query for the '{table_name}' table{db_info}.
+Help me write a {operation} query for the '{{table_name}}' table{{db_info}}.
 
 Please consider:
 1. The table structure and column types
@@ -726,14 +1660,46 @@ Please consider:
 3. Proper JOIN syntax if multiple tables are involved
 4. Best practices for {operation} operations
 
-Table: {table_name}
+Table: {{table_name}}
 Operation: {operation}
-Database: {database_id or 'default'}
+Database: {{database}}
 
 What would you like to accomplish with this query?
 """
 
 
+# Precompute the template for each common operation at import time so the
+# prompt handler is reduced to a dict lookup plus one .format call.
+_PROMPT_TEMPLATES = {
+    op: _render_prompt_template(op)
+    for op in ("SELECT", "INSERT", "UPDATE", "DELETE")
+}
+
+
+@mcp.prompt()
+def sql_query_helper(table_name: str, operation: str = "SELECT", database_id: Optional[str] = None) -> str:
+    """
+    Generate a helpful prompt for writing SQL queries against a specific table.
+
+    Args:
+        table_name: The table to query
+        operation: Type of SQL operation (SELECT, INSERT, UPDATE, DELETE)
+        database_id: Optional database identifier
+    """
+    db_info = f" in database '{database_id}'" if database_id else ""
+
+    template = _PROMPT_TEMPLATES.get(operation.upper())
+    if template is None:
+        # Uncommon operation: render on demand, preserving old behavior
+        template = _render_prompt_template(operation)
+
+    return template.format(
+        table_name=table_name,
+        db_info=db_info,
+        database=database_id or 'default'
+    )
+
+
 if __name__ == "__main__":
     # Run the server
     mcp.run()